@@ -0,0 +1,50 @@
+"""Time chart_script cold start, cache hits and per-chart export in one session."""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import chart_script
+from fleet import build_graph, fleet_of_size
+
+
+def timed_run(*args, cwd):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, os.path.join(ROOT, "chart_script.py"), *args],
+                   cwd=cwd, check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def run(charts, nodes):
+    with tempfile.TemporaryDirectory() as tmp:
+        cold = timed_run("--force", cwd=tmp)
+        hit = timed_run(cwd=tmp)
+        print(f"cold start, render:    {cold:8.3f} s")
+        print(f"cold start, cache hit: {hit:8.3f} s")
+
+        inputs = build_graph(fleet_of_size(nodes)).chart_inputs()
+        specs = [dict(inputs, batched=True, output=os.path.join(tmp, f"chart_{i}.png"))
+                 for i in range(charts)]
+        cache_file = os.path.join(tmp, "cache.json")
+
+        start = time.perf_counter()
+        chart_script.render_charts(specs, cache_file=cache_file, force=True)
+        session = time.perf_counter() - start
+        print(f"{charts} charts in one session: {session:8.3f} s ({session / charts:.3f} s/chart)")
+
+        start = time.perf_counter()
+        chart_script.render_charts(specs, cache_file=cache_file)
+        print(f"{charts} charts, all cached:    {time.perf_counter() - start:8.3f} s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--charts", type=int, default=10)
+    parser.add_argument("--nodes", type=int, default=1000)
+    args = parser.parse_args()
+    run(args.charts, args.nodes)
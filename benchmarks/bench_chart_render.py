@@ -0,0 +1,36 @@
+"""Benchmark chart_script rendering modes on synthetic fleets."""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import chart_script
+from fleet import build_graph, fleet_of_size
+
+
+def run(sizes, max_per_trace):
+    print(f"{'nodes':>7} {'mode':>10} {'traces':>7} {'build s':>9} {'json s':>8} {'json KiB':>10}")
+    for n in sizes:
+        inputs = build_graph(fleet_of_size(n)).chart_inputs()
+        for batched in (False, True):
+            if not batched and n > max_per_trace:
+                continue
+            start = time.perf_counter()
+            fig = chart_script.build_figure(**inputs, batched=batched)
+            built = time.perf_counter()
+            output = fig.to_json()
+            done = time.perf_counter()
+            mode = "batched" if batched else "per-trace"
+            print(f"{n:>7} {mode:>10} {len(fig.data):>7} {built - start:>9.3f} "
+                  f"{done - built:>8.3f} {len(output) / 1024:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--max-per-trace", type=int, default=1000,
+                        help="skip per-trace mode above this many nodes (it is quadratic)")
+    args = parser.parse_args()
+    run(args.sizes, args.max_per_trace)
@@ -0,0 +1,85 @@
+"""Overhead of phase timers and of the profiling switch when it is off."""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import script
+from fleet import synthetic_fleet
+from instrumentation import Metrics, profiling
+
+
+def per_call(func, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - start) / calls
+
+
+def interleaved(variants, calls, rounds):
+    """Min-of-rounds seconds per call for each variant, alternating variants every round.
+
+    Alternating keeps drift (frequency scaling, other load) from landing on a
+    single variant, and the minimum discards rounds that were interrupted.
+    """
+    best = {name: float("inf") for name in variants}
+    for _ in range(rounds):
+        for name, func in variants.items():
+            best[name] = min(best[name], per_call(func, calls))
+    return best
+
+
+def run(calls, hosts, rounds, max_phase_us):
+    metrics = Metrics()
+    os.environ.pop("NMS_PROFILE", None)
+
+    def bare():
+        pass
+
+    def timed():
+        with metrics.phase("bench", "noop"):
+            pass
+
+    def profiling_off():
+        with profiling():
+            pass
+
+    best = interleaved({"bare": bare, "timed": timed, "profiling_off": profiling_off},
+                       calls // rounds, rounds)
+    phase_cost = best["timed"] - best["bare"]
+    print(f"phase timer:        {phase_cost * 1e9:8.0f} ns/phase")
+    print(f"profiling off:      {(best['profiling_off'] - best['bare']) * 1e9:8.0f} ns/run")
+
+    # Relative cost on a real phase: rendering a fleet's Prometheus config
+    targets = synthetic_fleet(hosts=hosts, switches=max(1, hosts // 40))["targets"]
+
+    def plain():
+        script.render_prometheus_config(targets)
+
+    def instrumented():
+        with profiling(), metrics.phase("script", "render"):
+            script.render_prometheus_config(targets)
+
+    best = interleaved({"plain": plain, "instrumented": instrumented}, 5, rounds)
+    difference = best["instrumented"] - best["plain"]
+    print(f"config render ({hosts} hosts): {best['plain'] * 1000:.2f} ms, "
+          f"instrumented {difference * 1e6:+.1f} us ({difference / best['plain']:+.2%}, "
+          f"min of {rounds} interleaved rounds)")
+
+    # The render comparison is within noise; the absolute per-phase cost is what is gated
+    if phase_cost > max_phase_us * 1e-6:
+        print(f"❌ phase timer costs {phase_cost * 1e6:.1f} us, above {max_phase_us} us")
+        return False
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=200000)
+    parser.add_argument("--hosts", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--max-phase-us", type=float, default=20, help="fail above this cost per phase")
+    args = parser.parse_args()
+    sys.exit(0 if run(args.calls, args.hosts, args.rounds, args.max_phase_us) else 1)
@@ -0,0 +1,59 @@
+"""Measure live_chart update latency per refresh against a fake Prometheus."""
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import live_chart
+from fleet import build_graph, fleet_of_size
+
+
+def fake_prometheus(instances, down_every=10):
+    """Serve /api/v1/query with one sample per instance; every Nth instance is down."""
+    result = [
+        {"metric": {"instance": instance}, "value": [0, "0" if i % down_every == 0 else "1"]}
+        for i, instance in enumerate(instances)
+    ]
+    body = json.dumps({"status": "success", "data": {"resultType": "vector", "result": result}}).encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(sizes, refreshes):
+    print(f"{'nodes':>7} {'p50 ms':>8} {'max ms':>8}")
+    for n in sizes:
+        fleet = fleet_of_size(n)
+        instances = {name: attrs["address"] for name, attrs in fleet["nodes"].items()}
+        server = fake_prometheus(instances.values())
+        url = f"http://127.0.0.1:{server.server_port}"
+
+        topology = live_chart.LiveTopology(**build_graph(fleet).chart_inputs(), instances=instances)
+        latencies = [topology.refresh(url)["latency"] * 1000 for _ in range(refreshes)]
+        server.shutdown()
+        print(f"{n:>7} {statistics.median(latencies):>8.1f} {max(latencies):>8.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--refreshes", type=int, default=20)
+    args = parser.parse_args()
+    run(args.sizes, args.refreshes)
@@ -0,0 +1,52 @@
+"""Time incremental TopologyGraph deltas against a full rebuild."""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fleet import fleet_of_size
+from topology import TopologyGraph, diff_neighbors
+
+
+def run(edges, churn):
+    # A fleet is a tree, so n + 1 devices have n links
+    rows = fleet_of_size(edges + 1)["neighbors"]
+
+    start = time.perf_counter()
+    graph = TopologyGraph()
+    graph.apply_delta({"add": rows})
+    build = time.perf_counter() - start
+
+    # Move `churn` devices to a new uplink port
+    changed = list(rows)
+    for i in random.Random(1).sample(range(len(changed)), churn):
+        changed[i] = dict(changed[i], remote_port=changed[i]["remote_port"] + "-moved")
+
+    start = time.perf_counter()
+    delta = diff_neighbors(rows, changed)
+    diff = time.perf_counter() - start
+
+    start = time.perf_counter()
+    graph.apply_delta(delta)
+    apply = time.perf_counter() - start
+
+    start = time.perf_counter()
+    graph.prometheus_targets()
+    export = time.perf_counter() - start
+
+    print(f"{graph.link_count} links, {len(graph)} devices")
+    print(f"full build:        {build * 1000:9.2f} ms")
+    print(f"diff snapshots:    {diff * 1000:9.2f} ms")
+    print(f"apply {churn:>5} moves: {apply * 1000:9.2f} ms")
+    print(f"export targets:    {export * 1000:9.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--edges", type=int, default=50000)
+    parser.add_argument("--churn", type=int, default=500)
+    args = parser.parse_args()
+    run(args.edges, args.churn)
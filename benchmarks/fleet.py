@@ -0,0 +1,68 @@
+"""Synthetic fleet generator shared by the benchmark suite and the standalone benchmarks."""
+import random
+
+from topology import TopologyGraph
+
+
+def synthetic_fleet(hosts=100, switches=10, ports=48, sites=("hq", "dc1", "branch"), labels=None, seed=0):
+    """Hosts and switches with LLDP neighbor rows, node attributes and scrape targets.
+
+    Switch 0 is the core; every other switch uplinks to a random lower switch
+    and hosts take the remaining access ports. Scrape targets carry their
+    ``site`` plus any extra ``labels``, which the generator emits as target labels.
+    """
+    rng = random.Random(seed)
+    labels = labels or {}
+    nodes = {}
+    neighbors = []
+    targets = []
+    downlinks = [0] * switches
+
+    # Port 0 is each switch's uplink; downlinks to other switches count down from the top port
+    for s in range(switches):
+        name = f"sw-{s}"
+        address = f"10.{s // 250}.{s % 250}.1"
+        site = sites[s % len(sites)]
+        nodes[name] = {"address": address, "site": site, "role": "core" if s == 0 else "switch"}
+        targets.append({"job": "snmp", "target": address, "tier": "critical", "site": site, **labels})
+        if s:
+            uplink = rng.randrange(s)
+            downlinks[uplink] += 1
+            if downlinks[uplink] > ports - 2:
+                raise ValueError(f"sw-{uplink} has more downlinks than its {ports} ports")
+            neighbors.append({"local": name, "local_port": "port-0",
+                              "remote": f"sw-{uplink}", "remote_port": f"port-{ports - downlinks[uplink]}"})
+
+    # Hosts take the remaining access ports, one host per port
+    free_ports = [(f"sw-{s}", p) for s in range(switches) for p in range(1, ports - downlinks[s])]
+    if hosts > len(free_ports):
+        raise ValueError(f"{hosts} hosts do not fit in {len(free_ports)} free switch ports")
+
+    for h in range(hosts):
+        name = f"host-{h}"
+        address = f"172.{16 + h // 65536}.{h // 256 % 256}.{h % 256}"
+        switch, port = free_ports[h]
+        site = nodes[switch]["site"]
+        nodes[name] = {"address": address, "site": site, "role": "host"}
+        neighbors.append({"local": name, "local_port": "eth0", "remote": switch, "remote_port": f"port-{port}"})
+        tier = "critical" if h % 20 == 0 else "standard"
+        targets.append({"job": "node-exporter", "target": f"{address}:9100", "tier": tier, "site": site, **labels})
+        if h % 10 == 0:
+            targets.append({"job": "blackbox", "target": f"http://{address}", "tier": "low", "site": site, **labels})
+
+    return {"nodes": nodes, "neighbors": neighbors, "targets": targets}
+
+
+def fleet_of_size(nodes, ports=48, **kwargs):
+    """synthetic_fleet with about `nodes` devices, using as few switches as fit the hosts."""
+    switches = max(1, -(-nodes // (ports - 1)))
+    return synthetic_fleet(hosts=max(0, nodes - switches), switches=switches, ports=ports, **kwargs)
+
+
+def build_graph(fleet):
+    """TopologyGraph of a fleet's neighbor rows and node attributes."""
+    graph = TopologyGraph()
+    graph.apply_delta({"add": fleet["neighbors"]})
+    for name, attrs in fleet["nodes"].items():
+        graph.set_node(name, **attrs)
+    return graph
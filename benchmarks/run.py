@@ -0,0 +1,205 @@
+"""End-to-end benchmark suite over synthetic fleets.
+
+Times config generation (script.py), config parsing and capacity planning
+(capacity_planner.py), discovery (topology.py), chart rendering
+(chart_script.py) and node status evaluation (live_chart.py) at increasing
+fleet sizes. Results are written as JSON and compared against a baseline;
+the run fails when any case slows down by more than --threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import capacity_planner
+import chart_script
+import script
+from fleet import build_graph, synthetic_fleet
+from topology import diff_neighbors
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# (hosts, switches, ports) per scale
+SCALES = {
+    "small": (100, 10, 48),
+    "medium": (1000, 50, 48),
+    "large": (10000, 250, 48)
+}
+
+
+def case_config_generation(fleet):
+    return lambda: (script.render_prometheus_config(fleet["targets"]), script.tier_report(fleet["targets"]))
+
+
+def case_config_parsing(fleet):
+    config = script.render_prometheus_config(fleet["targets"])
+    return lambda: capacity_planner.plan(capacity_planner.load_scrape_jobs(config))
+
+
+def case_discovery(fleet):
+    # Full build, then re-discovery where every 20th host moved port
+    moved = [dict(row, remote_port=row["remote_port"] + "-moved") if i % 20 == 0 else row
+             for i, row in enumerate(fleet["neighbors"])]
+
+    def run():
+        graph = build_graph(fleet)
+        graph.apply_delta(diff_neighbors(fleet["neighbors"], moved))
+        graph.prometheus_targets()
+    return run
+
+
+def case_chart_rendering(fleet):
+    inputs = build_graph(fleet).chart_inputs()
+    return lambda: chart_script.build_figure(**inputs, batched=True).to_json()
+
+
+def case_status_evaluation(fleet):
+    import live_chart
+
+    inputs = build_graph(fleet).chart_inputs()
+    instances = {name: attrs["address"] for name, attrs in fleet["nodes"].items()}
+    topology = live_chart.LiveTopology(**inputs, instances=instances)
+    statuses = {("instance", address): i % 7 != 0 for i, address in enumerate(instances.values())}
+    return lambda: topology.apply(statuses)
+
+
+CASES = {
+    "config_generation": case_config_generation,
+    "config_parsing": case_config_parsing,
+    "discovery": case_discovery,
+    "chart_rendering": case_chart_rendering,
+    "status_evaluation": case_status_evaluation
+}
+
+# Cases that need optional packages
+REQUIRES = {
+    "config_parsing": "yaml",
+    "chart_rendering": "plotly",
+    "status_evaluation": "plotly"
+}
+
+
+def available(case):
+    module = REQUIRES.get(case)
+    if module is None:
+        return True
+    try:
+        __import__(module)
+    except ImportError:
+        return False
+    return True
+
+
+def measure(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def run(scales, cases, repeat, labels=None):
+    """Results per case plus the timed callables, for re-running suspects."""
+    results = {}
+    funcs = {}
+    for scale in scales:
+        hosts, switches, ports = SCALES[scale]
+        fleet = synthetic_fleet(hosts, switches, ports, labels=labels)
+        for case in cases:
+            if not available(case):
+                print(f"  {case}/{scale}: skipped ({REQUIRES[case]} not installed)")
+                continue
+            func = CASES[case](fleet)
+            func()  # warm up lazy imports and caches
+            timings = measure(func, repeat)
+            key = f"{case}/{scale}"
+            results[key] = {"median": statistics.median(timings), "min": min(timings)}
+            funcs[key] = func
+            print(f"  {key:<32} {results[key]['min'] * 1000:10.2f} ms")
+    return results, funcs
+
+
+def compare(results, baseline, threshold, rerun=None):
+    """Names of cases whose best time slowed down by more than threshold (a fraction).
+
+    The minimum is compared because it is the least sensitive to scheduler
+    noise. A case over the threshold is re-run once through rerun(key) and
+    only flagged if its best time is still too slow.
+    """
+    regressions = []
+    for key, result in results.items():
+        before = baseline.get(key)
+        if before is None:
+            continue
+        change = result["min"] / before["min"] - 1
+        if change > threshold and rerun is not None:
+            result["min"] = min(result["min"], min(rerun(key)))
+            change = result["min"] / before["min"] - 1
+        flag = "  ❌ regression" if change > threshold else ""
+        print(f"  {key:<32} {change:+8.1%}{flag}")
+        if change > threshold:
+            regressions.append(key)
+    return regressions
+
+
+def write_report(report, path):
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📝 Results written to {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmark suite")
+    parser.add_argument("--scales", nargs="+", choices=SCALES, default=list(SCALES))
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=list(CASES))
+    parser.add_argument("--repeat", type=int, default=15)
+    parser.add_argument("--output", default=os.path.join(HERE, "results.json"))
+    parser.add_argument("--baseline", default=os.path.join(HERE, "baseline.json"))
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="fail when a case's best time is this fraction slower than baseline")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    args = parser.parse_args()
+
+    print("⏱️  Running benchmarks")
+    results, funcs = run(args.scales, args.cases, args.repeat, labels={"env": "benchmark"})
+    report = {
+        "generated": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results
+    }
+    if args.save_baseline:
+        write_report(report, args.output)
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📌 Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        write_report(report, args.output)
+        print("No baseline to compare against (run with --save-baseline first)")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+    print(f"\n📊 Compared with baseline (threshold {args.threshold:.0%}):")
+    regressions = compare(results, baseline, args.threshold,
+                          rerun=lambda key: measure(funcs[key], args.repeat))
+    write_report(report, args.output)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    print("\n✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
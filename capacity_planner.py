@@ -0,0 +1,259 @@
+"""Size Prometheus from the generated scrape configuration.
+
+Reads the scrape jobs, target counts and intervals from prometheus.yml (and
+the file_sd target files topology.py writes next to it), combines them with
+per-exporter series estimates (or series measured on a running Prometheus)
+and projects ingestion rate, head-block memory and disk per retention period. With --write the recommended mem_limit and retention
+flags are written back into docker-compose.yml.
+"""
+import argparse
+import glob
+import json
+import math
+import os
+import re
+import urllib.parse
+import urllib.request
+
+# Typical active series exposed per target, by job name
+SERIES_PER_TARGET = {
+    "prometheus": 1500,
+    "node-exporter": 1000,
+    "snmp": 400,        # if_mib, ~24 interfaces
+    "blackbox": 25
+}
+DEFAULT_SERIES_PER_TARGET = 500
+
+# Head block cost per active series (chunks, labels, postings) doubled for Go GC headroom
+BYTES_PER_HEAD_SERIES = 8 * 1024
+# Process baseline independent of series count
+BASE_MEMORY = 256 * 1024 ** 2
+# Compressed bytes per sample on disk, plus WAL/compaction overhead
+BYTES_PER_SAMPLE = 1.7
+DISK_OVERHEAD = 1.2
+
+RETENTION_PERIODS = ["7d", "15d", "30d", "90d"]
+
+UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800, "y": 31536000}
+SIZES = {"B": 1, "KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3, "TB": 1024 ** 4}
+
+
+def parse_duration(value):
+    """Seconds in a Prometheus duration such as 15s, 1m30s or 15d."""
+    parts = re.findall(r"(\d+)([smhdwy])", value)
+    if not parts or "".join(n + u for n, u in parts) != value:
+        raise ValueError(f"Invalid duration: {value}")
+    return sum(int(n) * UNITS[u] for n, u in parts)
+
+
+def parse_size(value):
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)\s*([KMGT]?B)", value.upper())
+    if not match:
+        raise ValueError(f"Invalid size: {value}")
+    return float(match.group(1)) * SIZES[match.group(2)]
+
+
+def parse_series_override(value):
+    """JOB=N argument for --series."""
+    job, sep, count = value.partition("=")
+    if not sep or not job or not count.isdigit():
+        raise argparse.ArgumentTypeError(f"expected JOB=N, got {value!r}")
+    return job, int(count)
+
+
+def format_retention(seconds):
+    """Whole days when exact, otherwise hours; Prometheus treats 0d as unset."""
+    hours = int(seconds // 3600)
+    if hours < 1:
+        raise ValueError("Retention must be at least 1h")
+    return f"{hours // 24}d" if hours % 24 == 0 else f"{hours}h"
+
+
+def format_size(num_bytes):
+    for unit in ("TB", "GB", "MB", "KB"):
+        if num_bytes >= SIZES[unit]:
+            return f"{num_bytes / SIZES[unit]:.1f}{unit}"
+    return f"{num_bytes:.0f}B"
+
+
+def _discovered_targets(patterns, base_dir):
+    """Targets listed in the file_sd files matching patterns, resolved like Prometheus does."""
+    import yaml
+
+    count = 0
+    for pattern in patterns:
+        for path in sorted(glob.glob(os.path.join(base_dir, pattern))):
+            with open(path) as f:
+                groups = json.load(f) if path.endswith(".json") else yaml.safe_load(f)
+            count += sum(len(group.get("targets", [])) for group in groups or [])
+    return count
+
+
+def load_scrape_jobs(prometheus_yml, base_dir=None):
+    """[{job, targets, interval}] per static target group in the config text.
+
+    ``job`` is the effective job label, so tiered jobs that relabel back to
+    their exporter name pick up that exporter's series estimate.
+
+    file_sd jobs count the targets in their files, with paths relative to
+    base_dir (the directory holding prometheus.yml); without base_dir they
+    count none.
+    """
+    # PyYAML is only needed here, so script.py can import this module without it
+    import yaml
+
+    config = yaml.safe_load(prometheus_yml)
+    default_interval = parse_duration(config.get("global", {}).get("scrape_interval", "1m"))
+    jobs = []
+    for scrape in config.get("scrape_configs", []):
+        interval = scrape.get("scrape_interval")
+        interval = parse_duration(interval) if interval else default_interval
+        for group in scrape.get("static_configs", []):
+            jobs.append({
+                "job": group.get("labels", {}).get("job", scrape["job_name"]),
+                "job_name": scrape["job_name"],
+                "targets": len(group.get("targets", [])),
+                "interval": interval,
+                "file_sd": False
+            })
+        if scrape.get("file_sd_configs"):
+            # The generated discovered jobs set their job label by relabelling
+            job = next((rule["replacement"] for rule in scrape.get("relabel_configs", [])
+                        if rule.get("target_label") == "job" and "replacement" in rule),
+                       scrape["job_name"])
+            patterns = [pattern for sd in scrape["file_sd_configs"] for pattern in sd.get("files", [])]
+            jobs.append({
+                "job": job,
+                "job_name": scrape["job_name"],
+                "targets": _discovered_targets(patterns, base_dir) if base_dir is not None else 0,
+                "interval": interval,
+                "file_sd": True
+            })
+    return jobs
+
+
+def measured_series(prometheus_url, timeout=10):
+    """Average samples scraped per target, by job, from a running Prometheus."""
+    query = "avg by (job) (scrape_samples_scraped)"
+    url = prometheus_url.rstrip("/") + "/api/v1/query?" + urllib.parse.urlencode({"query": query})
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        payload = json.load(response)
+    return {
+        sample["metric"]["job"]: int(float(sample["value"][1]))
+        for sample in payload["data"]["result"]
+    }
+
+
+def estimate_ingestion(jobs, series_per_target=None):
+    """Active series and samples/second for a list of scrape jobs."""
+    series_per_target = {**SERIES_PER_TARGET, **(series_per_target or {})}
+    active_series = 0
+    samples_per_second = 0.0
+    for job in jobs:
+        series = job["targets"] * series_per_target.get(job["job"], DEFAULT_SERIES_PER_TARGET)
+        active_series += series
+        samples_per_second += series / job["interval"]
+    return active_series, samples_per_second
+
+
+def plan(jobs, series_per_target=None, retention="15d", disk_budget=None):
+    active_series, samples_per_second = estimate_ingestion(jobs, series_per_target)
+
+    memory = BASE_MEMORY + active_series * BYTES_PER_HEAD_SERIES
+    step = 256 * 1024 ** 2
+    mem_limit = math.ceil(memory / step) * step
+
+    disk_per_day = samples_per_second * 86400 * BYTES_PER_SAMPLE * DISK_OVERHEAD
+    disk = {period: disk_per_day * parse_duration(period) / 86400
+            for period in RETENTION_PERIODS + [retention]}
+
+    # Shorten retention to fit the budget, keeping 20% free for compaction
+    retention_seconds = parse_duration(retention)
+    retention_size = None
+    if disk_budget:
+        usable = disk_budget * 0.8
+        retention_size = usable
+        if disk[retention] > usable:
+            retention_seconds = usable / disk_per_day * 86400
+            if retention_seconds < 3600:
+                raise ValueError(f"Disk budget {format_size(disk_budget)} holds less than 1h of samples")
+
+    flags = [f"--storage.tsdb.retention.time={format_retention(retention_seconds)}"]
+    if retention_size:
+        flags.append(f"--storage.tsdb.retention.size={int(retention_size // SIZES['MB'])}MB")
+
+    return {
+        "active_series": active_series,
+        "samples_per_second": samples_per_second,
+        "head_memory": memory,
+        "mem_limit": f"{mem_limit // 1024 ** 2}m",
+        "disk": disk,
+        "retention_flags": flags
+    }
+
+
+def apply_to_compose(compose, mem_limit, retention_flags):
+    """Set mem_limit and replace retention flags in the prometheus service of a compose file."""
+    lines = compose.split("\n")
+    start = lines.index("  prometheus:")
+    end = next((i for i in range(start + 1, len(lines))
+                if lines[i].startswith("  ") and not lines[i].startswith("   ") and lines[i].strip()),
+               len(lines))
+    service = [line for line in lines[start + 1:end]
+               if "--storage.tsdb.retention" not in line and not line.startswith("    mem_limit:")]
+
+    command = service.index("    command:")
+    entry = command + 1
+    while entry < len(service) and service[entry].startswith("      - "):
+        entry += 1
+    service[entry:entry] = [f"      - '{flag}'" for flag in retention_flags]
+    service.insert(command, f"    mem_limit: {mem_limit}")
+
+    return "\n".join(lines[:start + 1] + service + lines[end:])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Size Prometheus memory and retention from the generated config")
+    parser.add_argument("--dir", default=".", help="directory holding the generated prometheus.yml and docker-compose.yml")
+    parser.add_argument("--retention", default="15d")
+    parser.add_argument("--disk-budget", type=parse_size, help="disk available to prometheus_data, e.g. 100GB")
+    parser.add_argument("--series", action="append", default=[], metavar="JOB=N", type=parse_series_override,
+                        help="override series per target for a job")
+    parser.add_argument("--measured", metavar="URL", help="take series per target from a running Prometheus")
+    parser.add_argument("--write", action="store_true", help="write recommendations into docker-compose.yml")
+    args = parser.parse_args()
+
+    with open(os.path.join(args.dir, "prometheus.yml")) as f:
+        jobs = load_scrape_jobs(f.read(), args.dir)
+
+    series = measured_series(args.measured) if args.measured else {}
+    series.update(args.series)
+
+    try:
+        result = plan(jobs, series, retention=args.retention, disk_budget=args.disk_budget)
+    except ValueError as e:
+        parser.error(str(e))
+
+    print("📐 Prometheus capacity plan")
+    print("=" * 60)
+    for job in jobs:
+        note = " (file_sd)" if job["file_sd"] else ""
+        print(f"  {job['job_name']:<24} {job['targets']:>6} targets every {job['interval']}s{note}")
+    print(f"\nActive series:      {result['active_series']:,}")
+    print(f"Samples/second:     {result['samples_per_second']:,.0f}")
+    print(f"Head memory:        {format_size(result['head_memory'])} -> mem_limit: {result['mem_limit']}")
+    for period, size in result["disk"].items():
+        print(f"Disk for {period:<10} {format_size(size)}")
+    print(f"Retention flags:    {' '.join(result['retention_flags'])}")
+
+    if args.write:
+        path = os.path.join(args.dir, "docker-compose.yml")
+        with open(path) as f:
+            compose = f.read()
+        with open(path, "w") as f:
+            f.write(apply_to_compose(compose, result["mem_limit"], result["retention_flags"]))
+        print(f"\n✅ Updated {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,12 @@
-import plotly.graph_objects as go
-import plotly.express as px
-import pandas as pd
-import numpy as np
+import argparse
+import hashlib
+import json
+import os
+
+from instrumentation import REGISTRY, phase, profiling
+
+# plotly is imported lazily inside the render functions so that cache hits
+# never pay for loading it or starting the image export engine
 
 # Data from the provided JSON
 data = [
@@ -17,8 +22,6 @@ data = [
     {"Component": "MySQL/MariaDB", "Port": 3306, "Protocol": "TCP", "Purpose": "Database", "Security": "User Auth + SSL"}
 ]
 
-df = pd.DataFrame(data)
-
 # Define positions for components in a logical network flow
 positions = {
     "Node Exporter": (1, 3),
@@ -32,9 +35,6 @@ positions = {
     "Alertmanager": (5, 2)
 }
 
-# Create unique components (handle Zabbix Server duplicates)
-unique_components = df.groupby('Component').first().reset_index()
-
 # Define component types for color coding
 component_types = {
     "Node Exporter": "Exporter",
@@ -59,10 +59,7 @@ colors = {
     "Alerting": "#964325"
 }
 
-# Create the figure
-fig = go.Figure()
-
-# Add connection lines
+# Connection lines between components
 connections = [
     ("Node Exporter", "Prometheus"),
     ("SNMP Exporter", "Prometheus"),
@@ -74,80 +71,254 @@ connections = [
     ("Zabbix Server", "Grafana")
 ]
 
-for start, end in connections:
-    x_start, y_start = positions[start]
-    x_end, y_end = positions[end]
-    
-    fig.add_trace(go.Scatter(
-        x=[x_start, x_end],
-        y=[y_start, y_end],
+# Batched mode only draws node labels up to this many nodes per trace
+LABEL_LIMIT = 200
+
+# Fingerprints of the inputs each output was last rendered from
+CACHE_FILE = ".chart_cache.json"
+
+
+def component_info(data):
+    """Group rows by component in one pass (first row wins for shared fields)."""
+    info = {}
+    for row in data:
+        entry = info.get(row["Component"])
+        if entry is None:
+            entry = info[row["Component"]] = {"Security": row["Security"], "ports": []}
+        entry["ports"].append(f"Port {row['Port']} ({row['Protocol']})")
+    return info
+
+
+def hover_text(component, comp_type, entry):
+    return f"<b>{component}</b><br>" + \
+        f"Type: {comp_type}<br>" + \
+        f"Ports: {', '.join(entry['ports'])}<br>" + \
+        f"Security: {entry['Security']}"
+
+
+def node_groups(info, component_types):
+    """Components per type, in the order batched mode lays out its node traces."""
+    groups = {}
+    for component in sorted(info):
+        groups.setdefault(component_types[component], []).append(component)
+    return groups
+
+
+def add_traces_per_component(fig, info, positions, connections, component_types, colors):
+    import plotly.graph_objects as go
+
+    # One trace per connection
+    for start, end in connections:
+        x_start, y_start = positions[start]
+        x_end, y_end = positions[end]
+
+        fig.add_trace(go.Scatter(
+            x=[x_start, x_end],
+            y=[y_start, y_end],
+            mode='lines',
+            line=dict(color='gray', width=2, dash='solid'),
+            showlegend=False,
+            hoverinfo='skip',
+            cliponaxis=False
+        ))
+
+    # One trace per component, legend entry on the first component of each type
+    legend_owners = {}
+    for component, comp_type in component_types.items():
+        legend_owners.setdefault(comp_type, component)
+
+    for component in sorted(info):
+        x, y = positions[component]
+        comp_type = component_types[component]
+
+        fig.add_trace(go.Scatter(
+            x=[x],
+            y=[y],
+            mode='markers+text',
+            marker=dict(
+                size=40,
+                color=colors[comp_type],
+                line=dict(width=2, color='white')
+            ),
+            text=component.replace(' ', '<br>'),
+            textposition='middle center',
+            textfont=dict(size=10, color='white'),
+            name=comp_type,
+            hovertext=hover_text(component, comp_type, info[component]),
+            hoverinfo='text',
+            showlegend=legend_owners[comp_type] == component,
+            cliponaxis=False
+        ))
+
+
+def add_traces_batched(fig, info, positions, connections, component_types, colors):
+    import plotly.graph_objects as go
+
+    # All edges in a single trace, segments separated by None
+    edge_x = []
+    edge_y = []
+    for start, end in connections:
+        x_start, y_start = positions[start]
+        x_end, y_end = positions[end]
+        edge_x += [x_start, x_end, None]
+        edge_y += [y_start, y_end, None]
+
+    fig.add_trace(go.Scattergl(
+        x=edge_x,
+        y=edge_y,
         mode='lines',
         line=dict(color='gray', width=2, dash='solid'),
         showlegend=False,
-        hoverinfo='skip',
-        cliponaxis=False
+        hoverinfo='skip'
     ))
 
-# Add component nodes
-for _, row in unique_components.iterrows():
-    component = row['Component']
-    x, y = positions[component]
-    comp_type = component_types[component]
-    
-    # Get all ports for this component
-    component_data = df[df['Component'] == component]
-    ports_info = []
-    for _, comp_row in component_data.iterrows():
-        ports_info.append(f"Port {comp_row['Port']} ({comp_row['Protocol']})")
-    
-    hover_text = f"<b>{component}</b><br>" + \
-                f"Type: {comp_type}<br>" + \
-                f"Ports: {', '.join(ports_info)}<br>" + \
-                f"Security: {row['Security']}"
-    
-    fig.add_trace(go.Scatter(
-        x=[x],
-        y=[y],
-        mode='markers+text',
-        marker=dict(
-            size=40,
-            color=colors[comp_type],
-            line=dict(width=2, color='white')
+    # One WebGL trace per component type
+    for comp_type, components in node_groups(info, component_types).items():
+        xs = []
+        ys = []
+        hover = []
+        for component in components:
+            x, y = positions[component]
+            xs.append(x)
+            ys.append(y)
+            hover.append(hover_text(component, comp_type, info[component]))
+
+        labelled = len(components) <= LABEL_LIMIT
+        fig.add_trace(go.Scattergl(
+            x=xs,
+            y=ys,
+            mode='markers+text' if labelled else 'markers',
+            marker=dict(
+                size=40 if labelled else 8,
+                color=colors[comp_type],
+                line=dict(width=2 if labelled else 0, color='white')
+            ),
+            text=[c.replace(' ', '<br>') for c in components] if labelled else None,
+            textposition='middle center',
+            textfont=dict(size=10, color='white'),
+            name=comp_type,
+            hovertext=hover,
+            hoverinfo='text'
+        ))
+
+
+def build_figure(data, positions, connections, component_types, colors, batched=False):
+    import plotly.graph_objects as go
+
+    info = component_info(data)
+
+    fig = go.Figure()
+    add_traces = add_traces_batched if batched else add_traces_per_component
+    add_traces(fig, info, positions, connections, component_types, colors)
+
+    # Pad the axes half a unit around the laid out nodes
+    xs = [positions[c][0] for c in info]
+    ys = [positions[c][1] for c in info]
+
+    # Update layout
+    fig.update_layout(
+        title="Network Monitor Architecture",
+        xaxis=dict(
+            showgrid=False,
+            zeroline=False,
+            showticklabels=False,
+            range=[min(xs) - 0.5, max(xs) + 0.5]
         ),
-        text=component.replace(' ', '<br>'),
-        textposition='middle center',
-        textfont=dict(size=10, color='white'),
-        name=comp_type,
-        hovertext=hover_text,
-        hoverinfo='text',
-        showlegend=True if component == list(component_types.keys())[list(component_types.values()).index(comp_type)] else False,
-        cliponaxis=False
-    ))
+        yaxis=dict(
+            showgrid=False,
+            zeroline=False,
+            showticklabels=False,
+            range=[min(ys) - 0.5, max(ys) + 0.5]
+        ),
+        legend=dict(
+            orientation='h',
+            yanchor='bottom',
+            y=1.05,
+            xanchor='center',
+            x=0.5
+        ),
+        plot_bgcolor='white'
+    )
+    return fig
+
+
+def chart_fingerprint(data, positions, connections, component_types, colors, batched=False):
+    """Hash of everything that affects the rendered image, including this module's code."""
+    with open(__file__, "rb") as f:
+        source = f.read()
+    inputs = json.dumps([data, positions, connections, component_types, colors, batched],
+                        sort_keys=True, default=str)
+    return hashlib.sha256(source + inputs.encode()).hexdigest()
+
+
+def load_cache(cache_file=CACHE_FILE):
+    try:
+        with open(cache_file) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def render_charts(charts, cache_file=CACHE_FILE, force=False):
+    """Render chart specs (build_figure kwargs plus ``output``), skipping unchanged ones.
+
+    Every chart that needs rendering is exported in one renderer session.
+    Returns the list of outputs that were actually written.
+    """
+    with phase("chart_script", "fingerprint"):
+        cache = load_cache(cache_file)
+        pending = []
+        for chart in charts:
+            spec = dict(chart)
+            output = spec.pop("output")
+            fingerprint = chart_fingerprint(**spec)
+            if not force and cache.get(output) == fingerprint and os.path.exists(output):
+                continue
+            pending.append((spec, output, fingerprint))
+
+    if not pending:
+        return []
+
+    with phase("chart_script", "build"):
+        import plotly.io as pio
+
+        figures = [build_figure(**spec) for spec, _, _ in pending]
+        outputs = [output for _, output, _ in pending]
+
+    with phase("chart_script", "export"):
+        if hasattr(pio, "write_images"):
+            pio.write_images(figures, outputs)
+        else:
+            # Older plotly keeps its kaleido scope alive between write_image calls
+            for fig, output in zip(figures, outputs):
+                fig.write_image(output)
+
+    for _, output, fingerprint in pending:
+        cache[output] = fingerprint
+    with open(cache_file, "w") as f:
+        json.dump(cache, f, indent=2)
+    return outputs
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render the network monitor architecture chart")
+    parser.add_argument("--batched", action="store_true",
+                        help="draw all edges and each node type as single WebGL traces (large topologies)")
+    parser.add_argument("--output", default="network_architecture.png")
+    parser.add_argument("--force", action="store_true", help="render even if the inputs are unchanged")
+    parser.add_argument("--metrics-file", help="write phase timings here in Prometheus textfile format")
+    parser.add_argument("--profile", metavar="PATH", help="write cProfile stats for this run to PATH")
+    args = parser.parse_args()
+
+    with profiling(args.profile):
+        rendered = render_charts([dict(data=data, positions=positions, connections=connections,
+                                       component_types=component_types, colors=colors,
+                                       batched=args.batched, output=args.output)],
+                                 force=args.force)
+    if args.metrics_file:
+        REGISTRY.write_textfile(args.metrics_file)
 
-# Update layout
-fig.update_layout(
-    title="Network Monitor Architecture",
-    xaxis=dict(
-        showgrid=False,
-        zeroline=False,
-        showticklabels=False,
-        range=[0.5, 5.5]
-    ),
-    yaxis=dict(
-        showgrid=False,
-        zeroline=False,
-        showticklabels=False,
-        range=[0.5, 4.5]
-    ),
-    legend=dict(
-        orientation='h',
-        yanchor='bottom',
-        y=1.05,
-        xanchor='center',
-        x=0.5
-    ),
-    plot_bgcolor='white'
-)
-
-# Save the chart
-fig.write_image("network_architecture.png")
\ No newline at end of file
+    if rendered:
+        print(f"Chart saved to {args.output}")
+    else:
+        print(f"{args.output} is up to date")
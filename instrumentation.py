@@ -0,0 +1,122 @@
+"""Self-instrumentation for the monitoring tools.
+
+Phase timers feed latency histograms that are exported in the Prometheus
+text format, either served on /metrics by long-running tools (live_chart.py)
+or written as a node-exporter textfile by one-shot scripts. profiling()
+wraps a single run in cProfile when asked to and costs nothing otherwise.
+"""
+import cProfile
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Prometheus client default buckets, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels):
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in labels)
+
+
+class Histogram:
+    """Labelled latency histogram in the Prometheus exposition format."""
+
+    def __init__(self, name, help, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self._series = {}   # sorted label items -> [per-bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, labels=()):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {labels: list(values) for labels, values in self._series.items()}
+        for labels, values in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), values):
+                cumulative += count
+                bucket_labels = _format_labels(labels + (("le", bound),))
+                lines.append(f"{self.name}_bucket{{{bucket_labels}}} {cumulative}")
+            label_text = f"{{{_format_labels(labels)}}}" if labels else ""
+            lines.append(f"{self.name}_sum{label_text} {values[-1]}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return "\n".join(lines)
+
+
+class _Phase:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, self.labels)
+
+
+class Metrics:
+    """Registry of histograms plus a phase timer keyed by tool and phase."""
+
+    def __init__(self):
+        self._histograms = {}
+        self.phases = self.histogram("nms_tool_phase_duration_seconds",
+                                     "Time spent in each phase of a monitoring tool run.")
+
+    def histogram(self, name, help, buckets=DEFAULT_BUCKETS):
+        if name not in self._histograms:
+            self._histograms[name] = Histogram(name, help, buckets)
+        return self._histograms[name]
+
+    def phase(self, tool, name):
+        """Context manager timing one phase of a tool into nms_tool_phase_duration_seconds."""
+        return _Phase(self.phases, (("phase", name), ("tool", tool)))
+
+    def render(self):
+        return "\n".join(h.render() for h in self._histograms.values()) + "\n"
+
+    def write_textfile(self, path):
+        """Atomically write the metrics for node-exporter's textfile collector."""
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            f.write(self.render())
+        os.replace(tmp, path)
+
+
+REGISTRY = Metrics()
+phase = REGISTRY.phase
+
+
+@contextmanager
+def profiling(path=None):
+    """cProfile the enclosed block into path (or $NMS_PROFILE); a no-op when neither is set."""
+    path = path or os.environ.get("NMS_PROFILE")
+    if not path:
+        yield
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+        print(f"🔬 Profile written to {path} (view with: python -m pstats {path})")
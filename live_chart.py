@@ -0,0 +1,227 @@
+"""Live health overlay for the architecture/topology chart.
+
+Polls Prometheus for ``up``/``probe_success`` of every node in one batched
+query and serves the batched chart as an HTML page that restyles marker
+colors and hover text in place on each refresh.
+"""
+import argparse
+import json
+import threading
+import time
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import chart_script
+import script
+from instrumentation import REGISTRY, phase
+
+# A node is healthy only if every up/probe_success series it covers is 1
+STATUS_QUERY = 'min by (job, instance) ({__name__=~"up|probe_success"})'
+
+# Architecture components whose health is their scrape job's, as generated by script.py.
+# For exporter jobs (snmp, blackbox) that is the health of the devices and sites
+# they probe, not of the exporter, so those nodes are labelled "Targets".
+COMPONENT_JOBS = {
+    "Prometheus": "prometheus",
+    "Node Exporter": "node-exporter",
+    "SNMP Exporter": "snmp",
+    "Blackbox Exporter": "blackbox"
+}
+
+# Marker colors by status; markers carry the status code and map it through
+# STATUS_COLORSCALE, which keeps per-refresh payloads numeric and cheap to validate
+status_colors = {
+    "unknown": "#B0B0B0",
+    "down": "#DB4545",
+    "up": "#2E8B57"
+}
+status_codes = {state: code for code, state in enumerate(status_colors)}
+STATUS_COLORSCALE = [[code / (len(status_colors) - 1), color]
+                     for code, color in enumerate(status_colors.values())]
+
+
+def query_status(prometheus_url, timeout=5):
+    """Health from one instant query, keyed by ("job", name) and ("instance", label).
+
+    A job or instance is healthy only if all of its series are.
+    """
+    url = prometheus_url.rstrip("/") + "/api/v1/query?" + urllib.parse.urlencode({"query": STATUS_QUERY})
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        payload = json.load(response)
+    if payload.get("status") != "success":
+        raise RuntimeError(f"Prometheus query failed: {payload.get('error', payload)}")
+    statuses = {}
+    for sample in payload["data"]["result"]:
+        healthy = float(sample["value"][1]) == 1
+        for label in ("job", "instance"):
+            value = sample["metric"].get(label)
+            if value is not None:
+                key = (label, value)
+                statuses[key] = statuses.get(key, True) and healthy
+    return statuses
+
+
+def selector_key(selector):
+    """("job", name) or ("instance", label) for a selector; plain strings are instances."""
+    if isinstance(selector, dict):
+        (label, value), = selector.items()
+        return label, value
+    return "instance", selector
+
+
+def default_instances(data, targets=None):
+    """Map components to the scrape jobs script.py generates for them.
+
+    Only components with a job in targets (default script.scrape_targets) are
+    mapped; the rest (e.g. Grafana, Zabbix, MySQL are not scraped) need
+    --instances and are otherwise shown as unknown.
+    """
+    jobs = {target["job"] for target in (script.scrape_targets if targets is None else targets)}
+    components = {row["Component"] for row in data}
+    return {
+        component: {"job": job}
+        for component, job in COMPONENT_JOBS.items()
+        if component in components and job in jobs
+    }
+
+
+class LiveTopology:
+    """Batched chart whose node markers are recolored from Prometheus status."""
+
+    def __init__(self, data, positions, connections, component_types, colors, instances):
+        self.figure = chart_script.build_figure(data, positions, connections, component_types,
+                                                colors, batched=True)
+        self.keys = {component: selector_key(selector) for component, selector in instances.items()}
+        self.status_labels = {
+            component: "Targets" if label == "job" and "exporter" in script.scrape_jobs.get(value, {})
+            else "Status"
+            for component, (label, value) in self.keys.items()
+        }
+        info = chart_script.component_info(data)
+        # Node traces follow the single edge trace, in node_groups order
+        self.groups = []
+        for offset, (comp_type, components) in enumerate(
+                chart_script.node_groups(info, component_types).items()):
+            base_hover = [chart_script.hover_text(c, comp_type, info[c]) for c in components]
+            self.groups.append((offset + 1, components, base_hover))
+            self.figure.data[offset + 1].marker.update(
+                colorscale=STATUS_COLORSCALE, cmin=0, cmax=len(status_colors) - 1)
+        self.last_update = None
+
+    def apply(self, statuses):
+        """Update marker colors and hover text only; returns the client restyle payload."""
+        traces = []
+        marker_colors = []
+        hover_texts = []
+        for index, components, base_hover in self.groups:
+            trace_colors = []
+            trace_hover = []
+            for component, hover in zip(components, base_hover):
+                healthy = statuses.get(self.keys.get(component))
+                state = "unknown" if healthy is None else "up" if healthy else "down"
+                trace_colors.append(status_codes[state])
+                trace_hover.append(f"{hover}<br>{self.status_labels.get(component, 'Status')}: {state}")
+            trace = self.figure.data[index]
+            trace.marker.color = trace_colors
+            trace.hovertext = trace_hover
+            traces.append(index)
+            marker_colors.append(trace_colors)
+            hover_texts.append(trace_hover)
+
+        return {
+            "traces": traces,
+            "marker.color": marker_colors,
+            "hovertext": hover_texts,
+            "updated": time.time()
+        }
+
+    def refresh(self, prometheus_url, timeout=5):
+        """Query and apply one status update, recording its end-to-end latency."""
+        start = time.perf_counter()
+        with phase("live_chart", "query"):
+            statuses = query_status(prometheus_url, timeout=timeout)
+        with phase("live_chart", "apply"):
+            update = self.apply(statuses)
+        update["latency"] = time.perf_counter() - start
+        self.last_update = update
+        return update
+
+    def html(self, interval):
+        # Page polls /status (once on load, then every interval) and restyles
+        # the existing traces instead of redrawing
+        post_script = (
+            "function refreshStatus() {"
+            " fetch('status').then(function (r) { return r.json(); }).then(function (u) {"
+            " if (!u.traces) { return; }"
+            " Plotly.restyle('topology', {'marker.color': u['marker.color'], 'hovertext': u.hovertext}, u.traces);"
+            " });"
+            " }"
+            f" refreshStatus(); setInterval(refreshStatus, {int(interval * 1000)});"
+        )
+        return self.figure.to_html(full_html=True, include_plotlyjs="cdn", div_id="topology",
+                                   post_script=post_script)
+
+
+def serve(topology, prometheus_url, host="0.0.0.0", port=8050, interval=15):
+    """Serve the live page and /metrics; a single poller refreshes status regardless of viewer count."""
+    page = topology.html(interval).encode()
+
+    def poll():
+        while True:
+            try:
+                update = topology.refresh(prometheus_url)
+                print(f"Refreshed status in {update['latency'] * 1000:.1f} ms")
+            except Exception as e:
+                print(f"Status refresh failed: {e}")
+            time.sleep(interval)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/":
+                body, content_type = page, "text/html; charset=utf-8"
+            elif self.path == "/status":
+                body = json.dumps(topology.last_update or {}).encode()
+                content_type = "application/json"
+            elif self.path == "/metrics":
+                body = REGISTRY.render().encode()
+                content_type = "text/plain; version=0.0.4"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    threading.Thread(target=poll, daemon=True).start()
+    server = ThreadingHTTPServer((host, port), Handler)
+    print(f"Serving live topology on http://{host}:{port}/")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the architecture chart with live node status")
+    parser.add_argument("--prometheus", default="http://localhost:9090")
+    parser.add_argument("--port", type=int, default=8050)
+    parser.add_argument("--interval", type=float, default=15, help="seconds between status refreshes")
+    parser.add_argument("--instances",
+                        help='JSON file mapping component name to an instance label or {"job": name}')
+    args = parser.parse_args()
+
+    instances = default_instances(chart_script.data)
+    if args.instances:
+        with open(args.instances) as f:
+            instances.update(json.load(f))
+    unmapped = sorted({row["Component"] for row in chart_script.data} - instances.keys())
+    if unmapped:
+        print(f"⚠️  No scrape target for {', '.join(unmapped)}; map them with --instances "
+              "or they stay unknown")
+
+    topology = LiveTopology(chart_script.data, chart_script.positions, chart_script.connections,
+                            chart_script.component_types, chart_script.colors, instances)
+    serve(topology, args.prometheus, port=args.port, interval=args.interval)
@@ -1,10 +1,12 @@
 # Create comprehensive network monitoring configuration files
+import argparse
 import json
 import os
+import re
 from datetime import datetime
 
-# Create directory structure for project files
-config_files = {}
+from capacity_planner import estimate_ingestion, parse_duration
+from instrumentation import REGISTRY, phase, profiling
 
 # 1. Zabbix Auto Discovery Configuration
 zabbix_discovery_config = {
@@ -68,10 +70,164 @@ zabbix_discovery_config = {
     ]
 }
 
-config_files['zabbix_discovery.json'] = json.dumps(zabbix_discovery_config, indent=2)
 
 # 2. Prometheus Configuration
-prometheus_config = """
+# Scrape tiers: critical devices are scraped often, test/lab targets rarely.
+# Prometheus already spreads each target's scrape offset within its interval.
+scrape_tiers = {
+    "critical": {"interval": "15s", "timeout": "10s"},
+    "standard": {"interval": "30s", "timeout": "10s"},
+    "low": {"interval": "2m", "timeout": "30s"}
+}
+
+# How each exporter job reaches its targets
+scrape_jobs = {
+    "prometheus": {"comment": "Prometheus itself"},
+    "node-exporter": {"comment": "Node Exporter for system metrics"},
+    "snmp": {
+        "comment": "SNMP Exporter for network devices",
+        "metrics_path": "/snmp",
+        "module": "if_mib",
+        "exporter": "localhost:9116  # SNMP exporter",
+        # Devices found by topology.py, labelled with site and uplink
+        "file_sd": {"files": "targets/snmp_*.json", "tier": "standard"}
+    },
+    "blackbox": {
+        "comment": "Blackbox exporter for HTTP/HTTPS monitoring",
+        "metrics_path": "/probe",
+        "module": "http_2xx",
+        "exporter": "localhost:9115  # Blackbox exporter"
+    },
+    # The project's own tools; only scraped when opted in, and excluded from InstanceDown
+    "nms-tools": {"comment": "Monitoring tools' own /metrics"}
+}
+
+# live_chart.py /metrics, added to scrape_targets by --scrape-live-chart
+LIVE_CHART_TARGET = {"job": "nms-tools", "target": "localhost:8050", "tier": "standard",
+                     "comment": "live_chart.py /metrics"}
+
+scrape_targets = [
+    {"job": "prometheus", "target": "localhost:9090", "tier": "critical"},
+    {"job": "node-exporter", "target": "localhost:9100", "tier": "critical"},
+    {"job": "node-exporter", "target": "192.168.1.10:9100", "tier": "standard"},
+    {"job": "node-exporter", "target": "192.168.1.11:9100", "tier": "standard"},
+    {"job": "snmp", "target": "192.168.1.1", "tier": "critical", "comment": "Router"},
+    {"job": "snmp", "target": "192.168.1.2", "tier": "critical", "comment": "Switch"},
+    {"job": "snmp", "target": "192.168.1.3", "tier": "critical", "comment": "Firewall"},
+    {"job": "blackbox", "target": "http://192.168.1.10", "tier": "low"},
+    {"job": "blackbox", "target": "https://192.168.1.11", "tier": "low"}
+]
+
+
+# Target keys used by the generator; any other key becomes a target label
+TARGET_KEYS = ("job", "target", "tier", "comment")
+LABEL_NAME = re.compile(r"[a-zA-Z_][a-zA-Z0-9_]*")
+
+
+def _quote(value):
+    """YAML single-quoted scalar."""
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def check_targets(targets, tiers=scrape_tiers, jobs=scrape_jobs):
+    """Raise ValueError for a target the generator cannot place, naming the target."""
+    for target in targets:
+        if target.get("job") not in jobs:
+            raise ValueError(f"Unknown job {target.get('job')!r} for target {target!r}; "
+                             f"expected one of {', '.join(jobs)}")
+        if target.get("tier") not in tiers:
+            raise ValueError(f"Unknown tier {target.get('tier')!r} for target {target!r}; "
+                             f"expected one of {', '.join(tiers)}")
+        for name in target:
+            if name not in TARGET_KEYS and not LABEL_NAME.fullmatch(name):
+                raise ValueError(f"Invalid label name {name!r} for target {target!r}")
+
+
+def _job_header(job, spec, name, tier, tiers, note):
+    lines = [
+        f"  # {spec['comment']} ({note})",
+        f"  - job_name: '{name}'",
+        f"    scrape_interval: {tiers[tier]['interval']}",
+        f"    scrape_timeout: {tiers[tier]['timeout']}"
+    ]
+    if "metrics_path" in spec:
+        lines += [
+            f"    metrics_path: {spec['metrics_path']}",
+            "    params:",
+            f"      module: [{spec['module']}]"
+        ]
+    return lines
+
+
+def _exporter_relabel(spec):
+    if "exporter" not in spec:
+        return []
+    return [
+        "      - source_labels: [__address__]",
+        "        target_label: __param_target",
+        "      - source_labels: [__param_target]",
+        "        target_label: instance",
+        "      - target_label: __address__",
+        f"        replacement: {spec['exporter']}"
+    ]
+
+
+def render_scrape_configs(targets, tiers=scrape_tiers, jobs=scrape_jobs):
+    """One scrape job per (exporter job, tier), keeping the exporter name as the job label.
+
+    Extra keys on a target (e.g. ``site``) are emitted as labels of its target group.
+
+    Jobs with a ``file_sd`` entry also get a ``<job>-discovered`` job reading
+    the target files written by topology.py.
+    """
+    check_targets(targets, tiers, jobs)
+    grouped = {}
+    for target in targets:
+        grouped.setdefault(target["job"], {}).setdefault(target["tier"], []).append(target)
+
+    blocks = []
+    for job, spec in jobs.items():
+        by_tier = grouped.get(job, {})
+        for tier in (t for t in tiers if t in by_tier):
+            lines = _job_header(job, spec, f"{job}-{tier}", tier, tiers, tier)
+            # One target group per distinct set of extra labels
+            label_groups = {}
+            for target in by_tier[tier]:
+                extra = tuple(sorted((k, v) for k, v in target.items() if k not in TARGET_KEYS))
+                label_groups.setdefault(extra, []).append(target)
+            lines.append("    static_configs:")
+            for extra, group in label_groups.items():
+                lines.append("      - targets:")
+                for target in group:
+                    comment = f"    # {target['comment']}" if "comment" in target else ""
+                    lines.append(f"        - {_quote(target['target'])}{comment}")
+                lines += ["        labels:", f"          job: '{job}'", f"          tier: '{tier}'"]
+                lines += [f"          {name}: {_quote(value)}" for name, value in extra]
+            relabel = _exporter_relabel(spec)
+            if relabel:
+                lines += ["    relabel_configs:"] + relabel
+            blocks.append("\n".join(lines))
+
+        if "file_sd" in spec:
+            tier = spec["file_sd"]["tier"]
+            lines = _job_header(job, spec, f"{job}-discovered", tier, tiers, "discovered by topology.py")
+            lines += [
+                "    file_sd_configs:",
+                "      - files:",
+                f"        - '{spec['file_sd']['files']}'",
+                "    relabel_configs:"
+            ] + _exporter_relabel(spec) + [
+                "      - target_label: job",
+                f"        replacement: '{job}'",
+                "      - target_label: tier",
+                f"        replacement: '{tier}'"
+            ]
+            blocks.append("\n".join(lines))
+    return "\n\n".join(blocks)
+
+
+def render_prometheus_config(targets, tiers=scrape_tiers, jobs=scrape_jobs):
+    return """
 global:
   scrape_interval: 15s
   evaluation_interval: 15s
@@ -86,56 +242,29 @@ alerting:
           - alertmanager:9093
 
 scrape_configs:
-  # Prometheus itself
-  - job_name: 'prometheus'
-    static_configs:
-      - targets: ['localhost:9090']
-
-  # Node Exporter for system metrics
-  - job_name: 'node-exporter'
-    static_configs:
-      - targets: 
-        - 'localhost:9100'
-        - '192.168.1.10:9100'
-        - '192.168.1.11:9100'
-
-  # SNMP Exporter for network devices
-  - job_name: 'snmp'
-    static_configs:
-      - targets:
-        - 192.168.1.1    # Router
-        - 192.168.1.2    # Switch
-        - 192.168.1.3    # Firewall
-    metrics_path: /snmp
-    params:
-      module: [if_mib]
-    relabel_configs:
-      - source_labels: [__address__]
-        target_label: __param_target
-      - source_labels: [__param_target]
-        target_label: instance
-      - target_label: __address__
-        replacement: localhost:9116  # SNMP exporter
-
-  # Blackbox exporter for HTTP/HTTPS monitoring
-  - job_name: 'blackbox'
-    metrics_path: /probe
-    params:
-      module: [http_2xx]
-    static_configs:
-      - targets:
-        - http://192.168.1.10
-        - https://192.168.1.11
-    relabel_configs:
-      - source_labels: [__address__]
-        target_label: __param_target
-      - source_labels: [__param_target]
-        target_label: instance
-      - target_label: __address__
-        replacement: localhost:9115  # Blackbox exporter
-"""
+""" + render_scrape_configs(targets, tiers, jobs) + "\n"
+
+
+def tier_report(targets, tiers=scrape_tiers, flat_interval="15s", series_per_target=None, jobs=scrape_jobs):
+    """Ingestion of the tiered jobs compared with scraping every target at flat_interval."""
+    check_targets(targets, tiers, jobs)
+    flat_jobs = []
+    tiered_jobs = []
+    for target in targets:
+        flat_jobs.append({"job": target["job"], "targets": 1,
+                          "interval": parse_duration(flat_interval)})
+        tiered_jobs.append({"job": target["job"], "targets": 1,
+                            "interval": parse_duration(tiers[target["tier"]]["interval"])})
+    series, flat_rate = estimate_ingestion(flat_jobs, series_per_target)
+    _, tiered_rate = estimate_ingestion(tiered_jobs, series_per_target)
+    return {
+        "flat_samples_per_second": flat_rate,
+        "tiered_samples_per_second": tiered_rate,
+        # Adding the tier label re-creates every existing series once
+        "series_churn": series
+    }
+
 
-config_files['prometheus.yml'] = prometheus_config
 
 # 3. Alert Rules Configuration
 alert_rules = """
@@ -143,7 +272,7 @@ groups:
 - name: network_alerts
   rules:
   - alert: InstanceDown
-    expr: up == 0
+    expr: up{job!="nms-tools"} == 0
     for: 1m
     labels:
       severity: critical
@@ -206,7 +335,6 @@ groups:
       description: "SSL certificate for {{ $labels.instance }} expires in less than 30 days."
 """
 
-config_files['alert_rules.yml'] = alert_rules
 
 # 4. Alertmanager Configuration with Email and Telegram
 alertmanager_config = """
@@ -275,7 +403,6 @@ inhibit_rules:
     equal: ['alertname', 'dev', 'instance']
 """
 
-config_files['alertmanager.yml'] = alertmanager_config
 
 # 5. Docker Compose for the entire stack
 docker_compose = """
@@ -306,6 +433,7 @@ services:
     volumes:
       - ./prometheus.yml:/etc/prometheus/prometheus.yml
       - ./alert_rules.yml:/etc/prometheus/alert_rules.yml
+      - ./targets:/etc/prometheus/targets
       - prometheus_data:/prometheus
     networks:
       - monitoring
@@ -321,10 +449,13 @@ services:
       - '--path.rootfs=/rootfs'
       - '--path.sysfs=/host/sys'
       - '--collector.filesystem.mount-points-exclude=^/(sys|proc|dev|host|etc)($$|/)'
+      - '--collector.textfile.directory=/var/lib/node_exporter/textfile'
     volumes:
       - /proc:/host/proc:ro
       - /sys:/host/sys:ro
       - /:/rootfs:ro
+      # Phase timings written by script.py and chart_script.py --metrics-file
+      - /var/lib/node_exporter/textfile:/var/lib/node_exporter/textfile:ro
     networks:
       - monitoring
 
@@ -374,7 +505,6 @@ services:
       - monitoring
 """
 
-config_files['docker-compose.yml'] = docker_compose
 
 # 6. Grafana Datasource Provisioning
 grafana_datasource = """
@@ -389,7 +519,6 @@ datasources:
     editable: true
 """
 
-config_files['grafana/provisioning/datasources/prometheus.yml'] = grafana_datasource
 
 # 7. Installation Script
 install_script = """#!/bin/bash
@@ -466,6 +595,9 @@ cd $PROJECT_DIR
 # Create configuration directories
 mkdir -p grafana/provisioning/datasources
 
+# Textfile collector directory for the tools' --metrics-file output
+sudo mkdir -p /var/lib/node_exporter/textfile
+
 # Download configuration files (this would be replaced with actual file creation)
 print_status "Creating configuration files..."
 
@@ -508,7 +640,6 @@ echo ""
 print_warning "Remember to change default passwords and configure proper authentication!"
 """
 
-config_files['install.sh'] = install_script
 
 # 8. Security Configuration Script
 security_script = """#!/bin/bash
@@ -700,16 +831,83 @@ echo "   - Enable two-factor authentication where possible"
 echo "   - Regularly update all components"
 """
 
-config_files['security_setup.sh'] = security_script
 
-# Print summary of created files
-print("📁 Network Monitoring System Configuration Files Created:")
-print("=" * 60)
-for filename, content in config_files.items():
-    print(f"✅ {filename} ({len(content)} characters)")
 
-# Save total configuration size
-total_size = sum(len(content) for content in config_files.values())
-print(f"\n📊 Total configuration size: {total_size:,} characters")
-print(f"📝 Number of files: {len(config_files)}")
-print(f"🕒 Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
\ No newline at end of file
+def build_config_files(targets=scrape_targets):
+    """Every generated file, keyed by its path relative to the project directory."""
+    config_files = {}
+    config_files['zabbix_discovery.json'] = json.dumps(zabbix_discovery_config, indent=2)
+    config_files['prometheus.yml'] = render_prometheus_config(targets)
+    config_files['alert_rules.yml'] = alert_rules
+    config_files['alertmanager.yml'] = alertmanager_config
+    config_files['docker-compose.yml'] = docker_compose
+    config_files['grafana/provisioning/datasources/prometheus.yml'] = grafana_datasource
+    config_files['install.sh'] = install_script
+    config_files['security_setup.sh'] = security_script
+    return config_files
+
+
+def write_config_files(config_files, output_dir):
+    """Write every generated file under output_dir, creating subdirectories."""
+    for filename, content in config_files.items():
+        path = os.path.join(output_dir, filename)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(content)
+        if filename.endswith('.sh'):
+            os.chmod(path, 0o755)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate network monitoring configuration files")
+    parser.add_argument("--output-dir", help="write the generated files into this directory")
+    parser.add_argument("--metrics-file", help="write phase timings here in Prometheus textfile format")
+    parser.add_argument("--profile", metavar="PATH", help="write cProfile stats for this run to PATH")
+    parser.add_argument("--scrape-live-chart", nargs="?", const=LIVE_CHART_TARGET["target"], metavar="ADDR",
+                        help=f"also scrape live_chart.py /metrics (default {LIVE_CHART_TARGET['target']})")
+    args = parser.parse_args()
+
+    targets = scrape_targets
+    if args.scrape_live_chart:
+        targets = scrape_targets + [{**LIVE_CHART_TARGET, "target": args.scrape_live_chart}]
+
+    try:
+        check_targets(targets)
+    except ValueError as e:
+        parser.error(str(e))
+
+    with profiling(args.profile):
+        with phase("script", "render"):
+            config_files = build_config_files(targets)
+
+        if args.output_dir:
+            with phase("script", "write"):
+                write_config_files(config_files, args.output_dir)
+
+        with phase("script", "report"):
+            report = tier_report(targets)
+
+    # Print summary of created files
+    print("📁 Network Monitoring System Configuration Files Created:")
+    print("=" * 60)
+    for filename, content in config_files.items():
+        print(f"✅ {filename} ({len(content)} characters)")
+
+    # Save total configuration size
+    total_size = sum(len(content) for content in config_files.values())
+    print(f"\n📊 Total configuration size: {total_size:,} characters")
+    print(f"📝 Number of files: {len(config_files)}")
+    print(f"🕒 Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+    # Ingestion saved by tiered scrape intervals
+    saved = 1 - report['tiered_samples_per_second'] / report['flat_samples_per_second']
+    print(f"\n⏱️  Samples/second: {report['tiered_samples_per_second']:,.0f} tiered vs "
+          f"{report['flat_samples_per_second']:,.0f} flat ({saved:.0%} less)")
+    print(f"🔁 One-off series churn from the tier label: {report['series_churn']:,} series")
+
+    if args.metrics_file:
+        REGISTRY.write_textfile(args.metrics_file)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+"""Deduplicated incremental snapshots of the Prometheus and Grafana data volumes.
+
+Files are split into fixed-size chunks stored once under their SHA-256 in a
+content-addressed store, so immutable TSDB blocks are never copied twice.
+Files whose size and mtime match the previous snapshot of the same tag reuse
+its chunk list without being read again. Everything is streamed one chunk at
+a time, so memory stays bounded regardless of volume size.
+
+Store layout::
+
+    <store>/objects/<2 hex>/<64 hex>     chunk contents
+    <store>/snapshots/<tag>-<time>.json  manifest: files, sizes, modes, chunks
+"""
+import argparse
+import hashlib
+import json
+import os
+import stat
+import sys
+from datetime import datetime
+
+CHUNK_SIZE = 4 * 1024 * 1024
+
+
+class Store:
+    """Content-addressed chunk store plus snapshot manifests."""
+
+    def __init__(self, root):
+        self.root = root
+        self.objects = os.path.join(root, "objects")
+        self.snapshots = os.path.join(root, "snapshots")
+        os.makedirs(self.objects, exist_ok=True)
+        os.makedirs(self.snapshots, exist_ok=True)
+
+    def object_path(self, digest):
+        return os.path.join(self.objects, digest[:2], digest)
+
+    def has(self, digest):
+        return os.path.exists(self.object_path(digest))
+
+    def put(self, data):
+        """Store a chunk if new; returns (digest, bytes written)."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.object_path(digest)
+        if os.path.exists(path):
+            return digest, 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        return digest, len(data)
+
+    def get(self, digest):
+        with open(self.object_path(digest), "rb") as f:
+            data = f.read()
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise ValueError(f"Corrupt chunk {digest}")
+        return data
+
+    def names(self, tag=None):
+        """Snapshot names, oldest first."""
+        names = sorted(name[:-5] for name in os.listdir(self.snapshots) if name.endswith(".json"))
+        if tag:
+            names = [name for name in names if name.rsplit("-", 1)[0] == tag]
+        return names
+
+    def load(self, name):
+        with open(os.path.join(self.snapshots, f"{name}.json")) as f:
+            return json.load(f)
+
+    def save(self, name, manifest):
+        path = os.path.join(self.snapshots, f"{name}.json")
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp, path)
+
+
+def _walk(source):
+    """Relative paths of directories and files under source, in a stable order."""
+    for dirpath, dirnames, filenames in os.walk(source):
+        dirnames.sort()
+        rel_dir = os.path.relpath(dirpath, source)
+        if rel_dir != ".":
+            yield rel_dir, True
+        for filename in sorted(filenames):
+            yield os.path.normpath(os.path.join(rel_dir, filename)), False
+
+
+def create(store, source, tag, verify=False):
+    """Snapshot source into store; returns (name, stats)."""
+    previous = {}
+    names = store.names(tag)
+    if names and not verify:
+        previous = {entry["path"]: entry for entry in store.load(names[-1])["files"]}
+
+    stats = {"files": 0, "bytes": 0, "read": 0, "written": 0, "skipped": 0}
+    files = []
+    dirs = []
+    for rel, is_dir in _walk(source):
+        path = os.path.join(source, rel)
+        try:
+            st = os.lstat(path)
+        except FileNotFoundError:
+            # Removed while walking, e.g. by TSDB compaction
+            stats["skipped"] += 1
+            continue
+        if is_dir:
+            dirs.append({"path": rel, "mode": stat.S_IMODE(st.st_mode)})
+            continue
+        if stat.S_ISLNK(st.st_mode):
+            files.append({"path": rel, "link": os.readlink(path)})
+            continue
+        if not stat.S_ISREG(st.st_mode):
+            continue
+
+        entry = {"path": rel, "size": st.st_size, "mode": stat.S_IMODE(st.st_mode), "mtime_ns": st.st_mtime_ns}
+        prior = previous.get(rel)
+        if prior and prior.get("size") == st.st_size and prior.get("mtime_ns") == st.st_mtime_ns \
+                and all(store.has(digest) for digest in prior["chunks"]):
+            entry["chunks"] = prior["chunks"]
+        else:
+            chunks = []
+            try:
+                with open(path, "rb") as f:
+                    while True:
+                        data = f.read(CHUNK_SIZE)
+                        if not data:
+                            break
+                        digest, written = store.put(data)
+                        chunks.append(digest)
+                        stats["read"] += len(data)
+                        stats["written"] += written
+            except FileNotFoundError:
+                stats["skipped"] += 1
+                continue
+            entry["chunks"] = chunks
+
+        files.append(entry)
+        stats["files"] += 1
+        stats["bytes"] += st.st_size
+
+    name = f"{tag}-{datetime.now().strftime('%Y%m%dT%H%M%S%f')}"
+    store.save(name, {
+        "source": os.path.abspath(source),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "dirs": dirs,
+        "files": files,
+        "stats": stats
+    })
+    return name, stats
+
+
+def restore(store, name, target):
+    """Recreate snapshot name under target, streaming one chunk at a time."""
+    manifest = store.load(name)
+    os.makedirs(target, exist_ok=True)
+    for entry in manifest["dirs"]:
+        os.makedirs(os.path.join(target, entry["path"]), exist_ok=True)
+    for entry in manifest["files"]:
+        path = os.path.join(target, entry["path"])
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if "link" in entry:
+            if os.path.lexists(path):
+                os.remove(path)
+            os.symlink(entry["link"], path)
+            continue
+        with open(path, "wb") as f:
+            for digest in entry["chunks"]:
+                f.write(store.get(digest))
+        os.chmod(path, entry["mode"])
+        os.utime(path, ns=(entry["mtime_ns"], entry["mtime_ns"]))
+    for entry in manifest["dirs"]:
+        os.chmod(os.path.join(target, entry["path"]), entry["mode"])
+    return manifest
+
+
+def prune(store, keep, tag=None):
+    """Keep the newest `keep` snapshots of each tag (or only of tag) and delete unreferenced chunks."""
+    by_tag = {}
+    for name in store.names(tag):
+        by_tag.setdefault(name.rsplit("-", 1)[0], []).append(name)
+    removed = [name for names in by_tag.values() for name in (names[:-keep] if keep else names)]
+    for name in removed:
+        os.remove(os.path.join(store.snapshots, f"{name}.json"))
+
+    referenced = set()
+    for name in store.names():
+        for entry in store.load(name)["files"]:
+            referenced.update(entry.get("chunks", ()))
+
+    freed = 0
+    for prefix in os.listdir(store.objects):
+        directory = os.path.join(store.objects, prefix)
+        for digest in os.listdir(directory):
+            if digest not in referenced:
+                path = os.path.join(directory, digest)
+                freed += os.path.getsize(path)
+                os.remove(path)
+        if not os.listdir(directory):
+            os.rmdir(directory)
+    return removed, freed
+
+
+def _size(num_bytes):
+    for unit, scale in (("GB", 1024 ** 3), ("MB", 1024 ** 2), ("KB", 1024)):
+        if num_bytes >= scale:
+            return f"{num_bytes / scale:.1f}{unit}"
+    return f"{num_bytes}B"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deduplicated snapshots of monitoring data volumes")
+    parser.add_argument("--store", required=True, help="snapshot store directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    create_parser = commands.add_parser("create", help="snapshot a directory")
+    create_parser.add_argument("source")
+    create_parser.add_argument("--tag", required=True, help="volume name, e.g. prometheus or grafana")
+    create_parser.add_argument("--verify", action="store_true",
+                               help="re-read every file instead of trusting size and mtime")
+
+    restore_parser = commands.add_parser("restore", help="restore a snapshot into a directory")
+    restore_parser.add_argument("name")
+    restore_parser.add_argument("target")
+
+    list_parser = commands.add_parser("list", help="list snapshots")
+    list_parser.add_argument("--tag")
+
+    prune_parser = commands.add_parser("prune", help="drop old snapshots and unreferenced chunks")
+    prune_parser.add_argument("--keep", type=int, required=True)
+    prune_parser.add_argument("--tag")
+
+    args = parser.parse_args()
+    store = Store(args.store)
+
+    if args.command == "create":
+        name, stats = create(store, args.source, args.tag, verify=args.verify)
+        print(f"✅ {name}: {stats['files']} files, {_size(stats['bytes'])} "
+              f"(read {_size(stats['read'])}, new {_size(stats['written'])})")
+        if stats["skipped"]:
+            print(f"⚠️  {stats['skipped']} files disappeared while snapshotting")
+    elif args.command == "restore":
+        if os.path.exists(args.target) and os.listdir(args.target):
+            sys.exit(f"Refusing to restore into non-empty directory {args.target}")
+        manifest = restore(store, args.name, args.target)
+        print(f"✅ Restored {len(manifest['files'])} files into {args.target}")
+    elif args.command == "list":
+        for name in store.names(args.tag):
+            stats = store.load(name)["stats"]
+            print(f"{name:<40} {stats['files']:>7} files {_size(stats['bytes']):>10}  new {_size(stats['written'])}")
+    elif args.command == "prune":
+        removed, freed = prune(store, args.keep, args.tag)
+        print(f"🧹 Removed {len(removed)} snapshots, freed {_size(freed)}")
+
+
+if __name__ == "__main__":
+    main()
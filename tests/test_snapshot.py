@@ -0,0 +1,93 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import snapshot
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    # Multi-chunk files without writing megabytes
+    monkeypatch.setattr(snapshot, "CHUNK_SIZE", 16)
+
+
+def write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def read_tree(root):
+    tree = {}
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            with open(path, "rb") as f:
+                tree[os.path.relpath(path, root)] = f.read()
+    return tree
+
+
+def test_restore_after_prune(tmp_path):
+    source = tmp_path / "data"
+    write(str(source / "block-0" / "chunks" / "000001"), b"a" * 40 + b"b" * 20)
+    write(str(source / "block-0" / "meta.json"), b'{"ulid": "block-0"}')
+    store = snapshot.Store(str(tmp_path / "store"))
+    snapshot.create(store, str(source), "prometheus")
+
+    # Retention drops block-0, compaction writes block-1
+    for path in ("chunks/000001", "meta.json"):
+        os.remove(str(source / "block-0" / path))
+    write(str(source / "block-1" / "chunks" / "000001"), os.urandom(100))
+    name, _ = snapshot.create(store, str(source), "prometheus")
+
+    removed, freed = snapshot.prune(store, 1, "prometheus")
+    assert len(removed) == 1 and freed > 0
+    assert store.names() == [name]
+
+    target = tmp_path / "restored"
+    snapshot.restore(store, name, str(target))
+    assert read_tree(str(target)) == read_tree(str(source))
+
+
+def test_unchanged_file_with_missing_chunk_is_reread(tmp_path):
+    source = tmp_path / "data"
+    content = os.urandom(50)
+    write(str(source / "wal" / "00000001"), content)
+    store = snapshot.Store(str(tmp_path / "store"))
+    first, _ = snapshot.create(store, str(source), "prometheus")
+
+    # Same size and mtime, so the previous chunk list would be reused as is
+    chunks = store.load(first)["files"][0]["chunks"]
+    assert len(chunks) == 4
+    os.remove(store.object_path(chunks[1]))
+
+    second, stats = snapshot.create(store, str(source), "prometheus")
+    assert stats["read"] == len(content)
+    assert store.has(chunks[1])
+
+    target = tmp_path / "restored"
+    snapshot.restore(store, second, str(target))
+    with open(str(target / "wal" / "00000001"), "rb") as f:
+        assert f.read() == content
+
+
+def test_prune_without_tag_keeps_newest_of_each_tag(tmp_path):
+    store = snapshot.Store(str(tmp_path / "store"))
+    kept = []
+    for tag in ("grafana", "prometheus"):
+        source = tmp_path / tag
+        for week in range(3):
+            write(str(source / "data"), f"{tag} week {week}".encode())
+            name, _ = snapshot.create(store, str(source), tag)
+        kept.append(name)
+
+    removed, _ = snapshot.prune(store, 1)
+    assert len(removed) == 4
+    assert store.names() == kept
+    for name in kept:
+        target = tmp_path / "restored" / name
+        snapshot.restore(store, name, str(target))
+        assert read_tree(str(target)) == read_tree(str(tmp_path / name.rsplit("-", 1)[0]))
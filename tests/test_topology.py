@@ -0,0 +1,79 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from topology import TopologyGraph, diff_neighbors, link_key
+
+
+def row(local, local_port, remote, remote_port):
+    return {"local": local, "local_port": local_port, "remote": remote, "remote_port": remote_port}
+
+
+def test_remove_and_readd_link():
+    graph = TopologyGraph()
+    link = row("host-1", "eth0", "sw-1", "port-1")
+    graph.add_link(link)
+    graph.remove_link(link)
+    assert len(graph) == 0 and graph.link_count == 0
+
+    graph.add_link(link)
+    assert len(graph) == 2 and graph.link_count == 1
+    assert graph.neighbors("sw-1") == ["host-1"]
+
+
+def test_freed_id_is_reused():
+    graph = TopologyGraph()
+    graph.add_link(row("host-1", "eth0", "sw-1", "port-1"))
+    graph.add_link(row("host-2", "eth0", "sw-1", "port-2"))
+    freed = graph._ids["host-1"]
+    graph.remove_node("host-1")
+    assert "host-1" not in graph._ids
+
+    graph.add_link(row("host-3", "eth0", "sw-1", "port-1"))
+    assert graph._ids["host-3"] == freed
+    assert sorted(graph.neighbors("sw-1")) == ["host-2", "host-3"]
+    assert graph.neighbors("host-3") == ["sw-1"]
+
+
+def test_reversed_row_is_the_same_link():
+    graph = TopologyGraph()
+    graph.add_link(row("host-1", "eth0", "sw-1", "port-1"))
+    graph.add_link(row("sw-1", "port-1", "host-1", "eth0"))
+    assert graph.link_count == 1
+    assert graph._adj[graph._ids["sw-1"]] == {graph._ids["host-1"]: 1}
+
+    graph.remove_link(row("sw-1", "port-1", "host-1", "eth0"))
+    assert graph.link_count == 0 and len(graph) == 0
+
+
+def test_node_with_attributes_survives_last_link():
+    graph = TopologyGraph()
+    graph.set_node("sw-1", address="10.0.0.1", site="hq", role="core")
+    old = [row("host-1", "eth0", "sw-1", "port-1")]
+    graph.apply_delta({"add": old})
+    graph.apply_delta(diff_neighbors(old, []))
+
+    assert "host-1" not in graph._ids
+    assert len(graph) == 1
+    assert graph.prometheus_targets() == [
+        {"targets": ["10.0.0.1"], "labels": {"site": "hq", "uplink": "none"}}]
+
+
+def test_self_link_with_one_port():
+    graph = TopologyGraph()
+    a = {"local": "sw-1", "local_port": "port-1", "remote": "sw-1"}
+    b = {"local": "sw-1", "remote": "sw-1", "remote_port": "port-1"}
+    assert link_key(a) == link_key(b)
+    graph.add_link(a)
+    graph.add_link(b)
+    assert graph.link_count == 1
+
+
+def test_unknown_root_is_reported():
+    graph = TopologyGraph()
+    graph.add_link(row("host-1", "eth0", "sw-1", "port-1"))
+    with pytest.raises(ValueError, match="sw-9"):
+        graph.uplinks(roots=["sw-9"])
@@ -0,0 +1,230 @@
+"""Discovery-driven topology graph.
+
+Neighbor rows gathered during discovery (SNMP LLDP-MIB lldpRemTable, one row
+per local port) are kept in an integer-indexed adjacency graph that is
+updated with add/remove deltas, and exported both as chart_script input and
+as Prometheus file_sd targets labelled with their site and uplink.
+
+A neighbor row is a dict with ``local``, ``local_port``, ``remote`` and
+``remote_port`` (lldpLocSysName, lldpLocPortId, lldpRemSysName,
+lldpRemPortId).
+"""
+import argparse
+import json
+import os
+from collections import deque
+
+import chart_script
+
+
+def link_key(row):
+    """Direction-independent identity of a neighbor row; a missing port counts as ""."""
+    a = (row["local"], row.get("local_port") or "")
+    b = (row["remote"], row.get("remote_port") or "")
+    return (a, b) if a <= b else (b, a)
+
+
+def diff_neighbors(old_rows, new_rows):
+    """Delta between two neighbor snapshots, as accepted by TopologyGraph.apply_delta."""
+    old = {link_key(row): row for row in old_rows}
+    new = {link_key(row): row for row in new_rows}
+    return {
+        "add": [new[key] for key in new.keys() - old.keys()],
+        "remove": [old[key] for key in old.keys() - new.keys()]
+    }
+
+
+class TopologyGraph:
+    """Adjacency graph with compact integer node ids and incremental updates."""
+
+    def __init__(self):
+        self._ids = {}      # name -> id
+        self._names = []    # id -> name, None for freed ids
+        self._attrs = []    # id -> {"address", "site", "role"}
+        self._adj = []      # id -> {neighbor id: number of links}
+        self._node_links = []  # id -> link keys touching the node
+        self._free = []
+        self._links = {}    # link key -> (id, id)
+
+    def __len__(self):
+        return len(self._ids)
+
+    @property
+    def link_count(self):
+        return len(self._links)
+
+    def _node_id(self, name):
+        node = self._ids.get(name)
+        if node is None:
+            if self._free:
+                node = self._free.pop()
+                self._names[node] = name
+            else:
+                node = len(self._names)
+                self._names.append(name)
+                self._attrs.append({})
+                self._adj.append({})
+                self._node_links.append(set())
+            self._ids[name] = node
+        return node
+
+    def set_node(self, name, **attrs):
+        """Record discovery attributes (address, site, role) for a device."""
+        self._attrs[self._node_id(name)].update(attrs)
+
+    def remove_node(self, name):
+        node = self._ids[name]
+        for key in list(self._node_links[node]):
+            self._drop_link(key)
+        if name in self._ids:
+            self._release(node)
+
+    def _release(self, node):
+        del self._ids[self._names[node]]
+        self._names[node] = None
+        self._attrs[node] = {}
+        self._free.append(node)
+
+    def add_link(self, row):
+        key = link_key(row)
+        if key in self._links:
+            return
+        a = self._node_id(row["local"])
+        b = self._node_id(row["remote"])
+        self._links[key] = (a, b)
+        self._node_links[a].add(key)
+        self._node_links[b].add(key)
+        if a != b:
+            self._adj[a][b] = self._adj[a].get(b, 0) + 1
+            self._adj[b][a] = self._adj[b].get(a, 0) + 1
+
+    def remove_link(self, row):
+        key = link_key(row)
+        if key in self._links:
+            self._drop_link(key)
+
+    def _drop_link(self, key):
+        """Remove a link; devices left without links or set_node attributes are dropped."""
+        a, b = self._links.pop(key)
+        self._node_links[a].discard(key)
+        self._node_links[b].discard(key)
+        if a != b:
+            for x, y in ((a, b), (b, a)):
+                if self._adj[x][y] == 1:
+                    del self._adj[x][y]
+                else:
+                    self._adj[x][y] -= 1
+        for node in {a, b}:
+            if not self._node_links[node] and not self._attrs[node]:
+                self._release(node)
+
+    def apply_delta(self, delta):
+        """Apply {"add": rows, "remove": rows}; cost is proportional to the delta only.
+
+        Devices discovered only through links disappear with their last link.
+        """
+        for row in delta.get("remove", ()):
+            self.remove_link(row)
+        for row in delta.get("add", ()):
+            self.add_link(row)
+
+    def neighbors(self, name):
+        return [self._names[n] for n in self._adj[self._ids[name]]]
+
+    def uplinks(self, roots=None):
+        """BFS parent of every node, walking out from the core.
+
+        Roots default to nodes with role "core", or the highest-degree node of
+        each connected component when none are marked.
+        """
+        if roots is None:
+            roots = [name for name, node in self._ids.items() if self._attrs[node].get("role") == "core"]
+        parent = {}
+        depth = {}
+
+        def walk(start):
+            parent[start] = None
+            depth[start] = 0
+            queue = deque([start])
+            while queue:
+                node = queue.popleft()
+                for neighbor in self._adj[node]:
+                    if neighbor not in depth:
+                        parent[neighbor] = node
+                        depth[neighbor] = depth[node] + 1
+                        queue.append(neighbor)
+
+        unknown = [name for name in roots if name not in self._ids]
+        if unknown:
+            raise ValueError(f"Unknown root device(s): {', '.join(map(str, unknown))}")
+        for name in roots:
+            if self._ids[name] not in depth:
+                walk(self._ids[name])
+        for node in sorted(self._ids.values(), key=lambda n: -len(self._adj[n])):
+            if node not in depth:
+                walk(node)
+
+        names = self._names
+        return {
+            names[node]: (None if up is None else names[up], depth[node])
+            for node, up in parent.items()
+        }
+
+    def chart_inputs(self, roots=None):
+        """Keyword arguments for chart_script.build_figure, laid out in BFS layers."""
+        uplinks = self.uplinks(roots)
+        palette = list(chart_script.colors.values())
+        data = []
+        positions = {}
+        component_types = {}
+        colors = {}
+        rows_per_depth = {}
+        for name, (_, depth) in uplinks.items():
+            role = self._attrs[self._ids[name]].get("role", "device")
+            row = rows_per_depth.get(depth, 0)
+            rows_per_depth[depth] = row + 1
+            positions[name] = (depth, row)
+            component_types[name] = role
+            colors.setdefault(role, palette[len(colors) % len(palette)])
+            data.append({"Component": name, "Port": 161, "Protocol": "UDP",
+                         "Purpose": role, "Security": "Internal Only"})
+
+        connections = [(self._names[a], self._names[b])
+                       for a, neighbors in enumerate(self._adj)
+                       for b in neighbors if a < b]
+        return dict(data=data, positions=positions, connections=connections,
+                    component_types=component_types, colors=colors)
+
+    def prometheus_targets(self, roots=None):
+        """file_sd target groups labelled with site and uplink; nodes without an address are skipped."""
+        groups = {}
+        for name, (uplink, _) in self.uplinks(roots).items():
+            attrs = self._attrs[self._ids[name]]
+            if "address" not in attrs:
+                continue
+            labels = {"site": attrs.get("site", "unknown"), "uplink": uplink or "none"}
+            key = (labels["site"], labels["uplink"])
+            groups.setdefault(key, {"targets": [], "labels": labels})["targets"].append(attrs["address"])
+        return list(groups.values())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build topology from discovered neighbor tables")
+    parser.add_argument("neighbors", help="JSON list of neighbor rows")
+    parser.add_argument("--nodes", help="JSON object mapping device name to {address, site, role}")
+    parser.add_argument("--targets", default="targets/snmp_targets.json",
+                        help="file_sd output, read by the generated snmp-discovered job")
+    args = parser.parse_args()
+
+    graph = TopologyGraph()
+    with open(args.neighbors) as f:
+        graph.apply_delta({"add": json.load(f)})
+    if args.nodes:
+        with open(args.nodes) as f:
+            for name, attrs in json.load(f).items():
+                graph.set_node(name, **attrs)
+
+    os.makedirs(os.path.dirname(args.targets) or ".", exist_ok=True)
+    with open(args.targets, "w") as f:
+        json.dump(graph.prometheus_targets(), f, indent=2)
+    print(f"✅ {len(graph)} devices, {graph.link_count} links -> {args.targets}")